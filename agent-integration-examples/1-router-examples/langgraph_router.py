@@ -3,11 +3,20 @@ LangGraph Router Example
 Intelligent task routing to specialized agents
 """
 
+import asyncio
+import functools
+import hashlib
+import os
+import re
+import time
+import weakref
 from typing import TypedDict, Literal
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
-import requests
+from langchain_core.outputs import Generation
+import httpx
 
 
 # State definition
@@ -24,106 +33,273 @@ llm = ChatOllama(
     base_url="http://localhost:11434"
 )
 
+# Length-capped LLM for the analysis and coding agents (writing stays uncapped)
+capped_llm = ChatOllama(
+    model="qwen2.5:7b",
+    base_url="http://localhost:11434",
+    num_predict=512
+)
 
-def classify_task(state: AgentState) -> AgentState:
-    """Classify the incoming task"""
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", """Classify the task into ONE category:
-        - research: finding information, news, data collection
-        - analysis: analyzing data, summarizing, interpreting
-        - coding: programming, debugging, code generation
-        - writing: creative writing, reports, documentation
+# Deterministic LLM for classification (required for caching its labels)
+classifier_llm = ChatOllama(
+    model="qwen2.5:7b",
+    base_url="http://localhost:11434",
+    temperature=0,
+    num_predict=8  # a single category name
+)
+
+# Checkpoints let an interrupted task resume from its last completed node
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", ".langgraph_state.db")
+
+# Shared HTTP client per event loop: keep-alive reuses sockets to the local
+# services, but pooled connections cannot cross loops (each asyncio.run)
+_http_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the running loop's HTTP client, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=8),
+            timeout=httpx.Timeout(27, connect=3),
+            transport=httpx.AsyncHTTPTransport(retries=2)
+        )
+        _http_clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running loop's HTTP client, if one was created"""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# Prompts (module constants so the system prefix is byte-identical on every
+# call and Ollama can reuse its KV cache for it)
+CLASSIFY_SYSTEM_PROMPT = (
+    "Classify the task into ONE category:\n"
+    "- research: finding information, news, data collection\n"
+    "- analysis: analyzing data, summarizing, interpreting\n"
+    "- coding: programming, debugging, code generation\n"
+    "- writing: creative writing, reports, documentation\n"
+    "\n"
+    "Respond with ONLY the category name."
+)
+ANALYSIS_SYSTEM_PROMPT = "You are an expert data analyst. Provide clear, structured analysis."
+CODING_SYSTEM_PROMPT = "You are an expert programmer. Provide clean, well-commented code."
+WRITING_SYSTEM_PROMPT = "You are a professional writer. Create clear, engaging content."
+
+CLASSIFY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", CLASSIFY_SYSTEM_PROMPT),
+    ("human", "{task}")
+])
+ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", ANALYSIS_SYSTEM_PROMPT),
+    ("human", "{task}")
+])
+CODING_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", CODING_SYSTEM_PROMPT),
+    ("human", "{task}")
+])
+WRITING_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", WRITING_SYSTEM_PROMPT),
+    ("human", "{task}")
+])
+
+CLASSIFY_CHAIN = CLASSIFY_PROMPT | classifier_llm
+ANALYSIS_CHAIN = ANALYSIS_PROMPT | capped_llm
+CODING_CHAIN = CODING_PROMPT | capped_llm
+WRITING_CHAIN = WRITING_PROMPT | llm
+
+
+# Classifier cache: exact hits in-process, near-duplicates via Redis (optional)
+TASK_TYPES = ("research", "analysis", "coding", "writing")
+CLASSIFY_CACHE_TTL = int(os.getenv("CLASSIFY_CACHE_TTL", "3600"))
+CLASSIFY_CACHE_SIZE = 1024
+CLASSIFY_CACHE_ENABLED = classifier_llm.temperature == 0
+
+_classify_cache: dict[str, tuple[float, str]] = {}
+_classify_llm_string = f"{classifier_llm.model}:{CLASSIFY_SYSTEM_PROMPT}"
+_semantic_cache = None
+
+if CLASSIFY_CACHE_ENABLED and os.getenv("REDIS_URL"):
+    # Extra install: pip install "langchain-redis<0.3"
+    from langchain_redis import RedisSemanticCache
+    from langchain_ollama import OllamaEmbeddings
+
+    # distance_threshold is a cosine distance: 0.05 ~ similarity 0.95
+    _semantic_cache = RedisSemanticCache(
+        embeddings=OllamaEmbeddings(
+            model="nomic-embed-text",
+            base_url="http://localhost:11434"
+        ),
+        redis_url=os.getenv("REDIS_URL"),
+        distance_threshold=0.05,
+        ttl=CLASSIFY_CACHE_TTL,
+        name="router_classifier",
+        prefix="router_classifier"
+    )
+
+
+# Keyword shortcuts for obvious tasks; LLM unless exactly one rule matches.
+# Matched against whole words so e.g. "history" does not hit "story"
+CLASSIFY_RULES = (
+    ("research", frozenset({"news", "recent", "find"})),
+    ("coding", frozenset({"function", "class", "debug", "code", "python", "javascript"})),
+    ("analysis", frozenset({"analyze", "summarize", "interpret", "trend", "trends"})),
+    ("writing", frozenset({"blog", "post", "article", "story", "essay"})),
+)
+
+
+def _rule_task_type(task: str) -> str | None:
+    words = set(re.findall(r"[a-z]+", task.lower()))
+    matches = [task_type for task_type, keywords in CLASSIFY_RULES if words & keywords]
+    
+    # Several categories hit means the task is ambiguous; let the LLM decide
+    return matches[0] if len(matches) == 1 else None
+
+
+def _cache_key(task: str) -> str:
+    return task.strip().lower()
+
+
+async def _cached_task_type(task: str) -> str | None:
+    """Look up a cached label for the task (exact match, then semantic)"""
+    key = _cache_key(task)
+    
+    entry = _classify_cache.get(key)
+    if entry:
+        expires_at, task_type = entry
+        if expires_at > time.monotonic():
+            return task_type
+        del _classify_cache[key]
+    
+    if _semantic_cache is not None:
+        hits = await asyncio.to_thread(_semantic_cache.lookup, key, _classify_llm_string)
+        if hits:
+            task_type = hits[0].text
+            _remember_task_type(key, task_type)
+            return task_type
+    
+    return None
+
+
+def _remember_task_type(key: str, task_type: str) -> None:
+    if len(_classify_cache) >= CLASSIFY_CACHE_SIZE:
+        # Dicts keep insertion order, so this evicts the oldest entry
+        del _classify_cache[next(iter(_classify_cache))]
+    _classify_cache[key] = (time.monotonic() + CLASSIFY_CACHE_TTL, task_type)
+
+
+async def classify_tasks(tasks: list[str]) -> list[str]:
+    """Classify several tasks: keyword rules, then cache, then one LLM batch"""
+    task_types = [_rule_task_type(t) for t in tasks]
+    
+    if CLASSIFY_CACHE_ENABLED:
+        unmatched = [i for i, task_type in enumerate(task_types) if task_type is None]
+        cached = await asyncio.gather(*[_cached_task_type(tasks[i]) for i in unmatched])
+        for i, task_type in zip(unmatched, cached):
+            task_types[i] = task_type
+    
+    misses = [i for i, task_type in enumerate(task_types) if task_type is None]
+    if misses:
+        responses = await CLASSIFY_CHAIN.abatch([{"task": tasks[i]} for i in misses])
         
-        Respond with ONLY the category name."""),
-        ("human", "{task}")
-    ])
+        for i, response in zip(misses, responses):
+            task_type = response.content.strip().lower()
+            task_types[i] = task_type
+            
+            # Only cache labels the router understands
+            if CLASSIFY_CACHE_ENABLED and task_type in TASK_TYPES:
+                key = _cache_key(tasks[i])
+                _remember_task_type(key, task_type)
+                if _semantic_cache is not None:
+                    await asyncio.to_thread(
+                        _semantic_cache.update, key, _classify_llm_string,
+                        [Generation(text=task_type)]
+                    )
     
-    chain = prompt | llm
-    response = chain.invoke({"task": state["task"]})
-    task_type = response.content.strip().lower()
+    return task_types
+
+
+async def classify_task(state: AgentState) -> dict:
+    """Classify the incoming task"""
+    task_type = (await classify_tasks([state["task"]]))[0]
     
     print(f"📋 Task classified as: {task_type}")
     
-    return {**state, "task_type": task_type}
+    return {"task_type": task_type}
 
 
-def research_agent(state: AgentState) -> AgentState:
+async def research_agent(state: AgentState) -> dict:
     """Handle research tasks using GDELT"""
     print("🔍 Research Agent activated")
     
     try:
         # Call GDELT service
-        response = requests.post(
+        response = await get_http_client().post(
             "http://localhost:8004/search",
             json={
                 "keywords": [state["task"]],
                 "timespan": "7d",
                 "max_results": 10
-            },
-            timeout=30
+            }
         )
         
         data = response.json()
         
         if data["success"]:
             articles = data["articles"][:5]
-            result = f"Found {data['count']} articles.\n\nTop 5:\n"
-            for i, article in enumerate(articles, 1):
-                result += f"{i}. {article.get('title', 'No title')}\n"
-                result += f"   Source: {article.get('domain', 'Unknown')}\n"
-                result += f"   URL: {article.get('url', '')}\n\n"
+            # One bounded line per article keeps downstream prompts small
+            result = f"Found {data['count']} articles.\n\nTop 5:\n" + "\n".join(
+                f"{i}. {(article.get('title') or 'No title')[:120]} — {article.get('domain', 'Unknown')}"
+                for i, article in enumerate(articles, 1)
+            )
             
-            return {**state, "result": result}
+            return {"result": result}
         else:
-            return {**state, "error": "Research failed"}
+            return {"error": "Research failed"}
             
     except Exception as e:
-        return {**state, "error": f"Research error: {str(e)}"}
+        return {"error": f"Research error: {str(e)}"}
 
 
-def analysis_agent(state: AgentState) -> AgentState:
+async def _stream_chain(chain, task: str) -> str:
+    """Stream a chain's completion so tokens surface as they are generated"""
+    parts = []
+    async for chunk in chain.astream({"task": task}):
+        parts.append(chunk.content)
+    return "".join(parts)
+
+
+async def analysis_agent(state: AgentState) -> dict:
     """Handle analysis tasks"""
     print("📊 Analysis Agent activated")
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert data analyst. Provide clear, structured analysis."),
-        ("human", "{task}")
-    ])
-    
-    chain = prompt | llm
-    response = chain.invoke({"task": state["task"]})
+    result = await _stream_chain(ANALYSIS_CHAIN, state["task"])
     
-    return {**state, "result": response.content}
+    return {"result": result}
 
 
-def coding_agent(state: AgentState) -> AgentState:
+async def coding_agent(state: AgentState) -> dict:
     """Handle coding tasks"""
     print("💻 Coding Agent activated")
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are an expert programmer. Provide clean, well-commented code."),
-        ("human", "{task}")
-    ])
+    result = await _stream_chain(CODING_CHAIN, state["task"])
     
-    chain = prompt | llm
-    response = chain.invoke({"task": state["task"]})
-    
-    return {**state, "result": response.content}
+    return {"result": result}
 
 
-def writing_agent(state: AgentState) -> AgentState:
+async def writing_agent(state: AgentState) -> dict:
     """Handle writing tasks"""
     print("✍️  Writing Agent activated")
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", "You are a professional writer. Create clear, engaging content."),
-        ("human": "{task}")
-    ])
-    
-    chain = prompt | llm
-    response = chain.invoke({"task": state["task"]})
+    result = await _stream_chain(WRITING_CHAIN, state["task"])
     
-    return {**state, "result": response.content}
+    return {"result": result}
 
 
 def route_task(state: AgentState) -> str:
@@ -138,9 +314,18 @@ def route_task(state: AgentState) -> str:
     return routing.get(state["task_type"], "analysis_agent")
 
 
+def route_entry(state: AgentState) -> str:
+    """Skip the classifier for tasks that arrive already classified"""
+    if state.get("task_type"):
+        return route_task(state)
+    
+    return "classify"
+
+
 # Build the graph
-def create_router_graph():
-    """Create the LangGraph router"""
+@functools.lru_cache(maxsize=1)
+def build_router_workflow() -> StateGraph:
+    """Build the (uncompiled) LangGraph router once and reuse it"""
     workflow = StateGraph(AgentState)
     
     # Add nodes
@@ -150,8 +335,17 @@ def create_router_graph():
     workflow.add_node("coding_agent", coding_agent)
     workflow.add_node("writing_agent", writing_agent)
     
-    # Set entry point
-    workflow.set_entry_point("classify")
+    # Set entry point (pre-classified tasks go straight to their agent)
+    workflow.set_conditional_entry_point(
+        route_entry,
+        {
+            "classify": "classify",
+            "research_agent": "research_agent",
+            "analysis_agent": "analysis_agent",
+            "coding_agent": "coding_agent",
+            "writing_agent": "writing_agent"
+        }
+    )
     
     # Add conditional routing
     workflow.add_conditional_edges(
@@ -171,13 +365,62 @@ def create_router_graph():
     workflow.add_edge("coding_agent", END)
     workflow.add_edge("writing_agent", END)
     
-    return workflow.compile()
+    return workflow
 
 
-# Example usage
-if __name__ == "__main__":
-    graph = create_router_graph()
+@functools.lru_cache(maxsize=1)
+def _compiled_router_graph():
+    return build_router_workflow().compile()
+
+
+def create_router_graph(checkpointer=None):
+    """Create the LangGraph router (compiled once and reused without a checkpointer)"""
+    if checkpointer is None:
+        return _compiled_router_graph()
     
+    # Checkpointers are scoped to a run, so don't keep them alive in a cache
+    return build_router_workflow().compile(checkpointer=checkpointer)
+
+
+def thread_id_for(task: str) -> str:
+    """Stable checkpoint thread id for a task (unlike hash(), survives restarts)"""
+    return hashlib.sha256(task.encode()).hexdigest()[:16]
+
+
+async def run_task(graph, state: AgentState) -> AgentState:
+    """Run one task, reporting when the agent's first token arrives"""
+    start = time.monotonic()
+    first_token = True
+    result = state
+    
+    # Resume an interrupted run from its last checkpoint instead of restarting
+    config = {"configurable": {"thread_id": thread_id_for(state["task"])}}
+    snapshot = await graph.aget_state(config)
+    inputs = None if snapshot.next else state
+    
+    async for event in graph.astream_events(inputs, config, version="v2"):
+        kind = event["event"]
+        node = event.get("metadata", {}).get("langgraph_node")
+        
+        if kind == "on_chat_model_stream" and node != "classify" and first_token:
+            first_token = False
+            print(f"⚡ [{state['task'][:40]}] first token after {time.monotonic() - start:.1f}s")
+        elif kind == "on_chain_end" and not event["parent_ids"]:
+            result = event["data"]["output"]
+    
+    return result
+
+
+# Example usage
+async def main():
+    try:
+        async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB) as checkpointer:
+            await run_examples(create_router_graph(checkpointer))
+    finally:
+        await close_http_client()
+
+
+async def run_examples(graph):
     # Test cases
     test_tasks = [
         "Find recent news about artificial intelligence",
@@ -186,19 +429,28 @@ if __name__ == "__main__":
         "Write a blog post about machine learning"
     ]
     
-    for task in test_tasks:
+    # Classify all tasks in one batch so Ollama can schedule them together
+    task_types = await classify_tasks(test_tasks)
+    for task, task_type in zip(test_tasks, task_types):
+        print(f"📋 [{task[:40]}] classified as: {task_type}")
+    
+    # Tasks are independent, so run them concurrently
+    states = [
+        {"task": task, "task_type": task_type, "result": "", "error": ""}
+        for task, task_type in zip(test_tasks, task_types)
+    ]
+    results = await asyncio.gather(*[run_task(graph, s) for s in states])
+    
+    for task, result in zip(test_tasks, results):
         print(f"\n{'='*60}")
         print(f"Task: {task}")
         print(f"{'='*60}")
         
-        result = graph.invoke({
-            "task": task,
-            "task_type": "",
-            "result": "",
-            "error": ""
-        })
-        
         if result.get("error"):
             print(f"❌ Error: {result['error']}")
         else:
             print(f"\n✅ Result:\n{result['result'][:500]}...")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
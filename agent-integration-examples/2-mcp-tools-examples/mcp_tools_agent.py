@@ -3,7 +3,11 @@ MCP Tools Integration Example
 Using LOCAL LLM services as tools for agents
 """
 
+import asyncio
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from langchain.agents import initialize_agent, AgentType
 from langchain.tools import tool
 from langchain_ollama import ChatOllama
@@ -15,29 +19,55 @@ llm = ChatOllama(
     base_url="http://localhost:11434"
 )
 
+# Shared HTTP session: keep-alive reuses sockets to the local services
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+))
+
+
+def _gdelt_payload(query: str) -> dict:
+    return {
+        "keywords": [query],
+        "timespan": "7d",
+        "max_results": 5
+    }
+
+
+def _n8n_payload(topic: str) -> dict:
+    return {
+        "agent_type": "researcher",
+        "task": f"Research {topic}",
+        "context": {"depth": "detailed"}
+    }
+
+
+def _format_gdelt(data: dict) -> str:
+    if data["success"]:
+        articles = data["articles"][:3]
+        result = f"Found {data['count']} articles. Top 3:\n\n"
+        for i, art in enumerate(articles, 1):
+            result += f"{i}. {art.get('title')}\n   {art.get('url')}\n\n"
+        return result
+    return "No articles found"
+
+
+def _format_n8n(data: dict) -> str:
+    return str(data.get("response", "Research completed"))
+
 
 @tool
 def gdelt_news_search(query: str) -> str:
     """Search GDELT for news articles about a topic"""
     try:
-        response = requests.post(
+        response = _SESSION.post(
             "http://localhost:8004/search",
-            json={
-                "keywords": [query],
-                "timespan": "7d",
-                "max_results": 5
-            },
-            timeout=30
+            json=_gdelt_payload(query),
+            timeout=(3, 27)
         )
-        
-        data = response.json()
-        if data["success"]:
-            articles = data["articles"][:3]
-            result = f"Found {data['count']} articles. Top 3:\n\n"
-            for i, art in enumerate(articles, 1):
-                result += f"{i}. {art.get('title')}\n   {art.get('url')}\n\n"
-            return result
-        return "No articles found"
+        return _format_gdelt(response.json())
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -46,24 +76,56 @@ def gdelt_news_search(query: str) -> str:
 def n8n_research_workflow(topic: str) -> str:
     """Trigger n8n research workflow for in-depth analysis"""
     try:
-        response = requests.post(
+        response = _SESSION.post(
             "http://localhost:8005/agent/task",
-            json={
-                "agent_type": "researcher",
-                "task": f"Research {topic}",
-                "context": {"depth": "detailed"}
-            },
-            timeout=60
+            json=_n8n_payload(topic),
+            timeout=(3, 57)
         )
-        
-        data = response.json()
-        return str(data.get("response", "Research completed"))
+        return _format_n8n(response.json())
     except Exception as e:
         return f"Error: {str(e)}"
 
 
+async def _gdelt_async(client: httpx.AsyncClient, query: str) -> str:
+    try:
+        response = await client.post(
+            "http://localhost:8004/search",
+            json=_gdelt_payload(query),
+            timeout=httpx.Timeout(27, connect=3)
+        )
+        return _format_gdelt(response.json())
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+async def _n8n_async(client: httpx.AsyncClient, topic: str) -> str:
+    try:
+        response = await client.post(
+            "http://localhost:8005/agent/task",
+            json=_n8n_payload(topic),
+            timeout=httpx.Timeout(57, connect=3)
+        )
+        return _format_n8n(response.json())
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@tool
+def combined_research(topic: str) -> str:
+    """Search GDELT news AND run the n8n research workflow in parallel. Use when a topic needs both recent news and in-depth analysis"""
+    async def run_both():
+        async with httpx.AsyncClient() as client:
+            return await asyncio.gather(
+                _gdelt_async(client, topic),
+                _n8n_async(client, topic)
+            )
+    
+    news, research = asyncio.run(run_both())
+    return f"News:\n{news}\nResearch:\n{research}"
+
+
 # Create agent with tools
-tools = [gdelt_news_search, n8n_research_workflow]
+tools = [gdelt_news_search, n8n_research_workflow, combined_research]
 
 agent = initialize_agent(
     tools,
@@ -5,21 +5,49 @@ Implements code and executes tasks using Open Interpreter.
 Works with OpenAI-compatible APIs (Ollama, vLLM, LiteLLM).
 """
 
+import functools
 import os
-from interpreter import interpreter
 from langchain_core.messages import AIMessage
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Configure Open Interpreter with OpenAI-compatible endpoint
-interpreter.llm.model = os.getenv("DEVELOPER_MODEL", "gpt-4o-mini")
-interpreter.llm.api_key = os.getenv("OPENAI_API_KEY", "not-needed-for-local")
-interpreter.llm.api_base = os.getenv("OPENAI_API_BASE")
+# Steer generated numeric code (e.g. backtests) toward fast array code
+PIPELINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CUSTOM_INSTRUCTIONS = f"""
+For numeric work on price series, prefer numpy array operations over Python loops.
+If a loop is unavoidable, wrap it with `@numba.njit(cache=True)`.
+Ready-made helpers live in `pipeline_utils` (add {PIPELINE_DIR!r} to sys.path to import it):
+- rsi(prices, period) -> np.ndarray
+- equity_curve(prices, positions, initial_capital) -> np.ndarray
+- max_drawdown(equity) -> float
+""".strip()
 
-# Safety settings
-interpreter.auto_run = os.getenv("DEVELOPER_AUTO_RUN", "false").lower() == "true"
-interpreter.safe_mode = os.getenv("DEVELOPER_SAFE_MODE", "ask")
+
+@functools.lru_cache(maxsize=1)
+def get_interpreter():
+    """
+    Import and configure Open Interpreter on first use.
+    
+    Open Interpreter pulls in litellm, tiktoken and friends, so importing
+    it is deferred until the developer actually runs.
+    
+    Returns:
+        Configured interpreter instance
+    """
+    from interpreter import interpreter
+    
+    # Configure Open Interpreter with OpenAI-compatible endpoint
+    interpreter.llm.model = os.getenv("DEVELOPER_MODEL", "gpt-4o-mini")
+    interpreter.llm.api_key = os.getenv("OPENAI_API_KEY", "not-needed-for-local")
+    interpreter.llm.api_base = os.getenv("OPENAI_API_BASE")
+    
+    # Safety settings
+    interpreter.auto_run = os.getenv("DEVELOPER_AUTO_RUN", "false").lower() == "true"
+    interpreter.safe_mode = os.getenv("DEVELOPER_SAFE_MODE", "ask")
+    
+    interpreter.custom_instructions = CUSTOM_INSTRUCTIONS
+    return interpreter
 
 
 def developer_node(state):
@@ -27,25 +55,17 @@ def developer_node(state):
     Developer node that implements code and executes tasks.
     
     Args:
-        state: Current conversation state with messages
+        state: Current pipeline state with the supervisor's instructions
         
     Returns:
         Updated state with development output
     """
     print("=== DEVELOPER ===")
-    messages = state["messages"]
-    last_message = messages[-1]
-    
-    # Extract task from supervisor's instructions
-    import json
-    try:
-        supervisor_json = json.loads(last_message.content)
-        task = supervisor_json.get("content", last_message.content)
-    except:
-        task = last_message.content
+    # Instructions were parsed once by the supervisor
+    task = state["next_content"]
     
     print(f"Developing: {task[:100]}...")
-    output = interpreter.chat(task)
+    output = get_interpreter().chat(task)
     print(f"Development complete")
     print("==================")
     
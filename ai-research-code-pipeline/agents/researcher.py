@@ -5,7 +5,6 @@ Conducts deep research on topics using GPT Researcher.
 Works with OpenAI-compatible APIs (Ollama, vLLM, LiteLLM).
 """
 
-import asyncio
 import os
 from gpt_researcher import GPTResearcher
 from langchain_core.messages import AIMessage
@@ -23,9 +22,9 @@ os.environ["EMBEDDING"] = os.getenv("RESEARCHER_EMBEDDING", "openai:text-embeddi
 os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY", "")
 
 
-def run_researcher_sync(query: str, report_type: str = "research_report") -> str:
+async def run_researcher(query: str, report_type: str = "research_report") -> str:
     """
-    Run GPT Researcher synchronously.
+    Run GPT Researcher on the caller's event loop.
     
     Args:
         query: Research query
@@ -34,38 +33,27 @@ def run_researcher_sync(query: str, report_type: str = "research_report") -> str
     Returns:
         Research report as string
     """
-    async def async_research():
-        researcher = GPTResearcher(query=query, report_type=report_type)
-        await researcher.conduct_research()
-        return await researcher.write_report()
-    
-    return asyncio.run(async_research())
+    researcher = GPTResearcher(query=query, report_type=report_type)
+    await researcher.conduct_research()
+    return await researcher.write_report()
 
 
-def researcher_node(state):
+async def researcher_node(state):
     """
     Researcher node that conducts research.
     
     Args:
-        state: Current conversation state with messages
+        state: Current pipeline state with the supervisor's instructions
         
     Returns:
         Updated state with research report
     """
     print("=== RESEARCHER ===")
-    messages = state["messages"]
-    last_message = messages[-1]
-    
-    # Extract query from supervisor's instructions
-    import json
-    try:
-        supervisor_json = json.loads(last_message.content)
-        query = supervisor_json.get("content", last_message.content)
-    except:
-        query = last_message.content
+    # Instructions were parsed once by the supervisor
+    query = state["next_content"]
     
     print(f"Researching: {query}")
-    result = run_researcher_sync(query)
+    result = await run_researcher(query)
     print(f"Research complete: {len(result)} characters")
     print("==================")
     
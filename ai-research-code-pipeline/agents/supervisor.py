@@ -6,8 +6,9 @@ Works with OpenAI-compatible APIs (Ollama, vLLM, LiteLLM).
 """
 
 import os
+import orjson
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import AIMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -20,25 +21,127 @@ You are a supervisor agent orchestrating an AI pipeline with specialized agents:
 Analyze the conversation and decide the next action:
 - call_researcher: Need to gather information or research a topic
 - call_developer: Need to implement code or execute tasks
+- parallel: Research and development steps are independent and can run at the same time
 - finish: Task is complete
 
 Respond ONLY with strict JSON:
 {
-  "next_action": "call_researcher" | "call_developer" | "finish",
+  "next_action": "call_researcher" | "call_developer" | "parallel" | "finish",
   "content": "instructions or summary for the next step"
 }
 
-Do NOT add any text outside JSON.
+For "parallel", also include one instruction per agent:
+{
+  "next_action": "parallel",
+  "content": "summary of the parallel step",
+  "parallel": [
+    {"agent": "researcher", "content": "research instructions"},
+    {"agent": "developer", "content": "development instructions"}
+  ]
+}
+
+Do NOT add any text outside JSON. Output compact JSON on a single line.
 """
 
-# Initialize LLM (OpenAI-compatible)
-llm = ChatOpenAI(
-    model=os.getenv("SUPERVISOR_MODEL", "gpt-4o-mini"),
-    temperature=0,
-    base_url=os.getenv("OPENAI_API_BASE"),
-    api_key=os.getenv("OPENAI_API_KEY", "not-needed-for-local")
+# Normalize once so the prompt is byte-identical on every call; providers
+# only reuse their prompt prefix cache on an exact match
+SYSTEM_PROMPT = "\n".join(
+    line.rstrip() for line in SYSTEM_PROMPT.strip().splitlines()
+)
+
+if os.getenv("SUPERVISOR_PROVIDER") == "anthropic":
+    from langchain_anthropic import ChatAnthropic
+
+    llm = ChatAnthropic(
+        model=os.getenv("SUPERVISOR_MODEL", "claude-3-5-haiku-latest"),
+        temperature=0
+    )
+    summarizer = ChatAnthropic(
+        model=os.getenv("SUMMARIZER_MODEL", "claude-3-5-haiku-latest"),
+        temperature=0
+    )
+    # Anthropic caches only up to an explicit breakpoint
+    SYSTEM_MESSAGE = SystemMessage(content=[{
+        "type": "text",
+        "text": SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }])
+else:
+    # Initialize LLM (OpenAI-compatible)
+    llm = ChatOpenAI(
+        model=os.getenv("SUPERVISOR_MODEL", "gpt-4o-mini"),
+        temperature=0,
+        base_url=os.getenv("OPENAI_API_BASE"),
+        api_key=os.getenv("OPENAI_API_KEY", "not-needed-for-local")
+    )
+    summarizer = ChatOpenAI(
+        model=os.getenv("SUMMARIZER_MODEL", "gpt-4o-mini"),
+        temperature=0,
+        base_url=os.getenv("OPENAI_API_BASE"),
+        api_key=os.getenv("OPENAI_API_KEY", "not-needed-for-local")
+    )
+    SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_PROMPT)
+
+# History window: the user query plus the last few messages are sent as-is,
+# anything older is folded into a running summary
+HISTORY_WINDOW = max(1, int(os.getenv("SUPERVISOR_HISTORY_WINDOW", "4")))
+
+SUMMARY_PROMPT = (
+    "Summarize the earlier steps of this AI pipeline run in a few sentences. "
+    "Keep key findings, decisions and open issues; drop code listings and boilerplate."
 )
 
+# Summary of all folded messages up to and including the keyed message id
+SUMMARY_CACHE_SIZE = 256
+_summaries: dict[str, str] = {}
+
+
+def window_messages(messages):
+    """
+    Bound the history sent to the supervisor.
+    
+    Args:
+        messages: Full conversation history
+        
+    Returns:
+        User query, a summary of older steps, and the most recent messages
+    """
+    if len(messages) <= HISTORY_WINDOW + 1:
+        return messages
+    
+    older = messages[1:-HISTORY_WINDOW]
+    
+    # Extend the latest cached summary with only the newly folded messages
+    previous, start = "", 0
+    for i in range(len(older) - 1, -1, -1):
+        if older[i].id in _summaries:
+            previous, start = _summaries[older[i].id], i + 1
+            break
+    
+    summary = previous
+    if start < len(older):
+        transcript = "\n\n".join(f"{m.type}: {m.content}" for m in older[start:])
+        if previous:
+            transcript = f"Summary so far:\n{previous}\n\n{transcript}"
+        try:
+            summary = summarizer.invoke([
+                SystemMessage(content=SUMMARY_PROMPT),
+                HumanMessage(content=transcript)
+            ]).content
+        except Exception as e:
+            # Fall back to plain truncation rather than failing the turn
+            print(f"Error summarizing history: {e}")
+        else:
+            if len(_summaries) >= SUMMARY_CACHE_SIZE:
+                # Dicts keep insertion order, so this evicts the oldest entry
+                del _summaries[next(iter(_summaries))]
+            _summaries[older[-1].id] = summary
+    
+    if not summary:
+        return [messages[0]] + messages[-HISTORY_WINDOW:]
+    
+    return [messages[0], AIMessage(content=f"Summary of earlier steps:\n{summary}")] + messages[-HISTORY_WINDOW:]
+
 
 def supervisor_node(state):
     """
@@ -48,15 +151,34 @@ def supervisor_node(state):
         state: Current conversation state with messages
         
     Returns:
-        Updated state with supervisor's decision
+        Updated state with the parsed decision and a log message
     """
     print("=== SUPERVISOR ===")
-    messages = state["messages"]
-    system_message = {"role": "system", "content": SYSTEM_PROMPT}
-    full_messages = [system_message] + messages
+    messages = window_messages(state["messages"])
+    # Static system prompt first, bounded conversation last
+    full_messages = [SYSTEM_MESSAGE] + messages
     
     response = llm.invoke(full_messages)
     print(f"Decision: {response.content}")
     print("==================")
     
-    return {"messages": [AIMessage(content=response.content)]}
+    try:
+        decision = orjson.loads(response.content)
+        if not isinstance(decision, dict):
+            print(f"Supervisor decision is not a JSON object: {response.content}")
+            decision = None
+    except orjson.JSONDecodeError as e:
+        print(f"Error parsing supervisor decision: {e}")
+        decision = None
+    
+    if decision is None:
+        decision = {"next_action": "finish", "content": response.content}
+    
+    content = str(decision.get("content", ""))
+    pending = decision.get("parallel", [])
+    return {
+        "messages": [AIMessage(content=content)],
+        "next_action": decision.get("next_action"),
+        "next_content": content,
+        "pending": pending if isinstance(pending, list) else [],
+    }
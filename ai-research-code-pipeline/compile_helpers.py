@@ -0,0 +1,24 @@
+"""
+Compile Helpers - Ahead-of-time build of the pipeline's numeric kernels
+
+Builds the `pipeline_kernels` extension module next to this file so
+pipeline_utils can load the RSI kernel without any JIT warmup.
+
+Usage:
+    python compile_helpers.py
+"""
+
+import os
+from numba.pycc import CC
+
+from pipeline_utils import _rsi_loop
+
+cc = CC("pipeline_kernels")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export("rsi", "f8[:](f8[:], i8)")(_rsi_loop)
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Built pipeline_kernels in {cc.output_dir}")
@@ -5,13 +5,18 @@ Autonomous pipeline: Idea → Research → Code → Validate
 Works with OpenAI-compatible APIs (Ollama, vLLM, LiteLLM).
 """
 
+import asyncio
+import functools
+import hashlib
+import importlib
 import os
-import json
-from typing import Annotated, Literal, TypedDict
+from typing import Annotated, Literal, Optional, TypedDict
 from dotenv import load_dotenv
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.types import Send
 from langgraph.graph.message import add_messages
-from langchain_core.messages import AIMessage, AnyMessage
+from langchain_core.messages import AnyMessage
 
 load_dotenv()
 
@@ -24,39 +29,72 @@ if os.getenv("OPENAI_API_BASE"):
 class AgentState(TypedDict):
     """State shared across all agents in the pipeline."""
     messages: Annotated[list[AnyMessage], add_messages]
+    next_action: Optional[str]
+    next_content: Optional[str]
+    pending: list[dict]
 
 
-# Import agents
-from agents.supervisor import supervisor_node
-from agents.researcher import researcher_node
-from agents.developer import developer_node
+# Agents are imported on first use: their dependencies (langchain_openai,
+# GPT Researcher, Open Interpreter) are slow to import
+@functools.lru_cache(maxsize=None)
+def load_agent(module: str, name: str):
+    """Import an agent node function once and reuse it."""
+    return getattr(importlib.import_module(module), name)
 
 
-def route_supervisor(state: AgentState) -> Literal["call_researcher", "call_developer", "finish"]:
+def supervisor_node(state: AgentState) -> dict:
+    """Run the supervisor agent, importing it on first use."""
+    return load_agent("agents.supervisor", "supervisor_node")(state)
+
+
+async def researcher_node(state: AgentState) -> dict:
+    """Run the researcher agent, importing GPT Researcher off the event loop."""
+    # A blocking import here would stall a parallel developer branch
+    node = await asyncio.to_thread(load_agent, "agents.researcher", "researcher_node")
+    return await node(state)
+
+
+def developer_node(state: AgentState) -> dict:
+    """Run the developer agent, importing it on first use."""
+    return load_agent("agents.developer", "developer_node")(state)
+
+
+# Agent names used in the supervisor's "parallel" plan
+PARALLEL_NODES = {
+    "researcher": "researcher_node",
+    "developer": "developer_node",
+}
+
+
+def route_supervisor(state: AgentState) -> Literal["call_researcher", "call_developer", "finish"] | list[Send]:
     """
     Route to next agent based on supervisor's decision.
     
+    A "parallel" decision fans out one Send per independent step. The
+    branches both return to the supervisor, which runs once they have
+    all finished.
+    
     Args:
         state: Current pipeline state
         
     Returns:
-        Next node to execute
+        Next node to execute, or the Send objects for a parallel step
     """
-    last_message = state["messages"][-1]
+    action = state.get("next_action")
     
-    if isinstance(last_message, AIMessage):
-        try:
-            response_json = json.loads(last_message.content)
-            action = response_json.get("next_action")
-            
-            if action == "call_researcher":
-                return "call_researcher"
-            elif action == "call_developer":
-                return "call_developer"
-            elif action == "finish":
-                return "finish"
-        except Exception as e:
-            print(f"Error parsing supervisor decision: {e}")
+    if action == "call_researcher":
+        return "call_researcher"
+    elif action == "call_developer":
+        return "call_developer"
+    elif action == "parallel":
+        # The plan comes from model output, so skip malformed steps
+        sends = [
+            Send(PARALLEL_NODES[step["agent"]], {**state, "next_content": step["content"]})
+            for step in state.get("pending", [])
+            if isinstance(step, dict) and step.get("agent") in PARALLEL_NODES and step.get("content")
+        ]
+        if sends:
+            return sends
     
     return "finish"
 
@@ -88,13 +126,55 @@ graph.add_conditional_edges(
 # Compile the graph
 pipeline = graph.compile()
 
+# Checkpoints let a failed run resume after its last completed node
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", ".langgraph_state.db")
+
+
+async def run_checkpointed(query: str, thread_id: str) -> dict:
+    """
+    Run the pipeline with a SQLite checkpointer, resuming if interrupted.
+    
+    Each run of a query gets its own numbered thread ("<thread_id>-0",
+    "<thread_id>-1", ...). Finished runs are skipped, so a new run never
+    inherits an old history; an interrupted run is resumed.
+    
+    Args:
+        query: User query or task
+        thread_id: Base checkpoint thread id for this query
+        
+    Returns:
+        Final pipeline state
+    """
+    async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB) as checkpointer:
+        app = graph.compile(checkpointer=checkpointer)
+        
+        run = 0
+        while True:
+            config = {"configurable": {"thread_id": f"{thread_id}-{run}"}}
+            snapshot = await app.aget_state(config)
+            
+            if snapshot.next:
+                print(f"Resuming from checkpoint before: {', '.join(snapshot.next)}\n")
+                return await app.ainvoke(None, config)
+            if not snapshot.values:
+                return await app.ainvoke({
+                    "messages": [{"role": "user", "content": query}]
+                }, config)
+            
+            # This run already finished; start a fresh one
+            run += 1
+
 
-def run_pipeline(query: str) -> dict:
+def run_pipeline(query: str, thread_id: Optional[str] = None) -> dict:
     """
     Run the AI Research-Code Pipeline.
     
+    Re-running a query that previously failed resumes from its last
+    checkpoint, so completed research and development steps are skipped.
+    
     Args:
         query: User query or task
+        thread_id: Base checkpoint thread id (defaults to a hash of the query)
         
     Returns:
         Pipeline execution result with all messages
@@ -104,9 +184,11 @@ def run_pipeline(query: str) -> dict:
     print("=" * 60)
     print(f"\nQuery: {query}\n")
     
-    result = pipeline.invoke({
-        "messages": [{"role": "user", "content": query}]
-    })
+    # hash() is salted per process, so use a stable digest for resumable runs
+    thread_id = thread_id or hashlib.sha256(query.encode()).hexdigest()[:16]
+    
+    # The researcher node is async, so drive the graph on one event loop
+    result = asyncio.run(run_checkpointed(query, thread_id))
     
     print("\n" + "=" * 60)
     print("FINAL RESULT")
@@ -0,0 +1,112 @@
+"""
+Pipeline Utils - Fast numeric helpers for generated backtests
+
+Vectorized NumPy helpers the developer agent can import instead of
+writing Python loops over daily prices. The RSI recurrence cannot be
+vectorized, so it is compiled with Numba: ahead of time when the
+`pipeline_kernels` extension has been built (see compile_helpers.py),
+otherwise JIT-compiled on first use.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+def _rsi_loop(prices, period):
+    n = prices.shape[0]
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        change = prices[i] - prices[i - 1]
+        if change > 0:
+            avg_gain += change
+        else:
+            avg_loss -= change
+    avg_gain /= period
+    avg_loss /= period
+
+    for i in range(period, n):
+        if i > period:
+            change = prices[i] - prices[i - 1]
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+
+        if avg_loss == 0.0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    return out
+
+
+try:
+    from pipeline_kernels import rsi as _rsi_kernel
+except ImportError:
+    _rsi_kernel = njit(cache=True, fastmath=True)(_rsi_loop)
+
+
+def rsi(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Relative Strength Index using Wilder's smoothing.
+
+    Args:
+        prices: 1-D array of closing prices
+        period: Lookback window
+
+    Returns:
+        Array of RSI values (0-100), NaN until the first full window
+    """
+    # The AOT kernel is compiled for exactly float64[:] and int64
+    return _rsi_kernel(np.ascontiguousarray(prices, dtype=np.float64), np.int64(period))
+
+
+def equity_curve(prices: np.ndarray, positions: np.ndarray, initial_capital: float = 1.0) -> np.ndarray:
+    """
+    Equity curve of a long/flat/short strategy, fully vectorized.
+
+    Args:
+        prices: 1-D array of closing prices
+        positions: Position held after each close (1 long, 0 flat, -1 short)
+        initial_capital: Starting equity
+
+    Returns:
+        Equity value at each close, starting at initial_capital
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+
+    returns = np.diff(prices) / prices[:-1]
+    strategy_returns = positions[:-1] * returns
+
+    equity = np.empty_like(prices)
+    equity[0] = initial_capital
+    equity[1:] = initial_capital * np.cumprod(1.0 + strategy_returns)
+    return equity
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """
+    Largest peak-to-trough decline of an equity curve.
+
+    Args:
+        equity: Equity values over time
+
+    Returns:
+        Maximum drawdown as a negative fraction (e.g. -0.25 for 25%)
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    peaks = np.maximum.accumulate(equity)
+    return float((equity / peaks - 1.0).min())